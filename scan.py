@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+
+# one C-level pass over the blob finds every line holding any of the three
+# needles; classification afterwards is a cheap bytes test per match
+PATTERN = re.compile(rb"(?m)^[^\n]*(?:///|TODO|std\.debug\.print)[^\n]*")
+
+# side-cache of previous scan results, keyed by path and validated against
+# (st_mtime_ns, st_size) so unchanged files only cost a stat() on re-runs
+CACHE_FILE = ".vasm-scan-cache.json"
+
+# directories that never hold .zig sources we care about; descending into a
+# populated .zig-cache in particular can dwarf the rest of the walk
+SKIP_DIRS = {"zig-out", ".zig-cache", ".git", "node_modules"}
+
+def walkZigFiles(root: str):
+    """Yields every .zig file under root. Uses an explicit stack over
+    os.scandir so the directory entry type comes straight from the kernel
+    instead of a separate stat() per entry like os.walk does."""
+    stack = [root]
+
+    while stack:
+        directory = stack.pop()
+
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and entry.name.endswith(".zig"):
+                    yield entry.path
+
+def loadCache():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def saveCache(cache):
+    try:
+        with open(CACHE_FILE + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+
+        os.replace(CACHE_FILE + ".tmp", CACHE_FILE)
+    except OSError:
+        pass
+
+cache = loadCache()
+
+def prefetchFiles(paths):
+    """Asks the kernel to start pulling the files into the page cache
+    before the scan threads get to them, overlapping readahead with the
+    Python-level parsing. No-op where posix_fadvise is unavailable."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+def scanFile(file: str):
+    """Extracts the /// documentation comments, the TODO lines, and any
+    std.debug.print calls from file in a single regex pass, so the file is
+    only opened and read once. The file is read as one bytes blob; only
+    the matching lines are decoded at the end."""
+    doc_lines = []
+    todo_lines = []
+    bad_lines = []
+
+    try:
+        stat = os.stat(file)
+
+        cached = cache.get(file)
+        if cached is not None and len(cached) == 5 \
+                and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2], cached[3], cached[4]
+
+        with open(file, "rb") as f:
+            data = f.read()
+
+    except OSError as error:
+        print(f"error: failed to scan file because of error: {error}")
+        sys.exit(1)
+
+    for match in PATTERN.finditer(data):
+        line = match.group()
+        stripped = line.lstrip()
+
+        if stripped.startswith(b"///") and stripped.strip() != b"///":
+            doc_lines.append(line.strip().decode("utf-8", "replace"))
+
+        if b"TODO" in line:
+            todo_lines.append(line.strip().decode("utf-8", "replace"))
+
+        if b"std.debug.print" in line:
+            bad_lines.append(line.strip().decode("utf-8", "replace"))
+
+    cache[file] = [stat.st_mtime_ns, stat.st_size, doc_lines, todo_lines, bad_lines]
+
+    return doc_lines, todo_lines, bad_lines
+
+def printResult(sub_path: str, mode: str, docs, todos, bads):
+    if mode == "docs":
+        lines = docs
+    elif mode == "todos":
+        lines = todos
+    elif mode == "bad-lines":
+        lines = bads
+    else:
+        lines = docs + todos
+
+    if len(lines) <= 0: return
+
+    print(f"documentation in {sub_path}")
+
+    for line in lines:
+        print(f"  {line}")
+
+# which of the extractions to print; `docs` prints only the /// comments,
+# `todos` prints only the TODO lines, `bad-lines` prints the
+# std.debug.print calls, anything else prints docs and todos
+mode = sys.argv[1] if len(sys.argv) > 1 else "all"
+
+# scanning is I/O bound and releases the GIL, so the reads are handed to a
+# thread pool; iterating map() keeps the output in submission order
+paths = list(walkZigFiles("."))
+
+prefetchFiles(paths)
+
+with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 4) as executor:
+    results = zip(paths, executor.map(scanFile, paths))
+
+    for sub_path, (docs, todos, bads) in results:
+        printResult(sub_path, mode, docs, todos, bads)
+
+saveCache(cache)
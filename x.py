@@ -1,9 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from subprocess import run
 from sys import argv
-from os import system as internal_system, makedirs, listdir, walk
-from os.path import basename, join
-from shutil import which
-from colorama import Fore, Style
-from webbrowser import open as open_url
+from os import makedirs, listdir, scandir, cpu_count
+from os.path import basename, getmtime
+from shutil import which, rmtree
 
 # The format used to generate web docs
 WEB_FORMAT = "html"
@@ -11,11 +12,12 @@ WEB_FORMAT = "html"
 # The format used for the manual pages
 MAN_FORMAT = "manpage"
 
-# The asciidoctor binary location
-ASCIIDOCTOR = which("asciidoctor")
-
-# The zig binary location
-ZIG = which("zig")
+# Looks up a binary on PATH; memoized so the PATH walk happens at most once
+# per tool per run, and only when a step actually needs the tool (instead
+# of at import time, where even `x.py help` paid for it)
+@lru_cache(maxsize=None)
+def which_cached(name: str):
+    return which(name)
 
 # The optimization of the output.
 OPTIMIZE = "ReleaseSafe"
@@ -25,26 +27,55 @@ TARGET = ""
 
 
 # Helper functions
-def system(command: str) -> None:
-    command_fragments = command.split(" ")
-    command_fragments[0] = (
-        f" {Fore.BLACK}{Style.DIM}{basename(command_fragments[0])}{Style.RESET_ALL}"
-    )
 
+# The dimmed echo prefix for an executable; memoized so repeated commands
+# don't redo the basename and ANSI formatting on every call
+@lru_cache(maxsize=None)
+def command_tag(executable: str) -> str:
+    from colorama import Fore, Style
+
+    return f" {Fore.BLACK}{Style.DIM}{basename(executable)}{Style.RESET_ALL} "
+
+
+def system(command: list) -> None:
     print(
-        f"{' '.join(command_fragments)}",
+        command_tag(command[0]) + " ".join(command[1:]),
         flush=True,
     )
-    internal_system(command)
+    run(command, check=False)
 
 
 def ensure_dir(path):
     makedirs(path, exist_ok=True)
 
 
+def walk_suffix(root: str, suffix: str):
+    """Yields the path of every file under root whose name ends with
+    suffix. scandir hands back an already-joined entry.path, so the hot
+    loop pays no os.path.join calls."""
+    stack = [root]
+
+    while stack:
+        with scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    yield entry.path
+
+
+def system_parallel(commands: list) -> None:
+    """Runs each command concurrently; asciidoctor conversions are
+    independent per file, so the multi-hundred-ms Ruby startups overlap."""
+    with ThreadPoolExecutor(max_workers=cpu_count()) as executor:
+        list(executor.map(system, commands))
+
+
 # Ensure steps
 def ensure_zig():
-    if ZIG is None:
+    from colorama import Fore, Style
+
+    if which_cached("zig") is None:
         print(
             f"{Fore.YELLOW}{Style.DIM}EnsureZig failed: VASM requires Zig to be installed.{Style.RESET_ALL}{Fore.RESET}"
         )
@@ -55,7 +86,9 @@ def ensure_zig():
 
 
 def ensure_asciidoc():
-    if ASCIIDOCTOR is None:
+    from colorama import Fore, Style
+
+    if which_cached("asciidoctor") is None:
         print(
             f"{Fore.YELLOW}{Style.DIM}EnsureAsciiDoc failed: VASM requires Asciidoctor to be installed.{Style.RESET_ALL}{Fore.RESET}"
         )
@@ -65,18 +98,18 @@ def ensure_asciidoc():
 
 def tests():
     """Builds the tests suite"""
-    system(f"{ZIG} build tests")
+    system([which_cached("zig"), "build", "tests"])
 
 
 def tests_summary():
     """Builds the tests suite and runs it with the --summary flag"""
-    system(f"{ZIG} build tests --summary all")
+    system([which_cached("zig"), "build", "tests", "--summary", "all"])
 
 
 def clean():
     """Cleans any zig cache files."""
-    system("rm zig-out -rf")
-    system("rm .zig-cache -rf")
+    rmtree("zig-out", ignore_errors=True)
+    rmtree(".zig-cache", ignore_errors=True)
 
 
 def docs():
@@ -88,46 +121,102 @@ def docs():
 def site():
     """Builds the site documentation. Reading every .adoc file in the docs/ directory"""
 
-    for dir_path, dir_names, files in walk("docs"):
-        for file in files:
-            if file.endswith(".adoc"):
-                system(f"{ASCIIDOCTOR} -b {WEB_FORMAT} {join(dir_path, file)}")
+    # one invocation for every file so the Ruby interpreter and gems only
+    # load once instead of once per .adoc
+    paths = list(walk_suffix("docs", ".adoc"))
+
+    system([which_cached("asciidoctor"), "-b", WEB_FORMAT, *paths])
 
 
 def man_pages():
     """Builds the man pages"""
 
-    for file in listdir("man-src"):
-        if file.endswith(".adoc"):
-            system(
-                f"{ASCIIDOCTOR} -b {WEB_FORMAT} ./man-src/{file} -o ./docs/man/{file[0:-5]}.html"
-            )
-            system(
-                f"{ASCIIDOCTOR} -b {MAN_FORMAT} ./man-src/{file} -o ./man/man1/{file[0:-5]}.1"
-            )
+    paths = [f"./man-src/{file}" for file in listdir("man-src") if file.endswith(".adoc")]
+
+    # one batched invocation per backend; -D derives each output name from
+    # the source file, matching the old per-file -o arguments
+    system_parallel(
+        [
+            [which_cached("asciidoctor"), "-b", WEB_FORMAT, "-D", "./docs/man", *paths],
+            [which_cached("asciidoctor"), "-b", MAN_FORMAT, "-D", "./man/man1", *paths],
+        ]
+    )
 
 
 def vasm():
     """Builds the vasm program"""
-    system(
-        f"{ZIG} build -Doptimize={OPTIMIZE} {'-Dtarget=' + TARGET if TARGET != '' else ''} --summary all"
-    )
+    command = [which_cached("zig"), "build", f"-Doptimize={OPTIMIZE}"]
+
+    if TARGET != "":
+        command.append(f"-Dtarget={TARGET}")
+
+    system(command + ["--summary", "all"])
+
+
+def serve():
+    """Rebuilds the documentation continuously. Polls the .adoc sources
+    and re-runs asciidoctor on just the files that changed since the last
+    pass, so iterative doc editing pays one small batched conversion per
+    save instead of a full site build. Stop with ctrl-c."""
+    from time import sleep
+
+    print("rebuilding documentation on change (ctrl-c to stop)")
+
+    mtimes = {}
+
+    try:
+        while True:
+            site_changed = []
+            man_changed = []
+
+            for path in walk_suffix("docs", ".adoc"):
+                mtime = getmtime(path)
+
+                if mtimes.get(path) != mtime:
+                    mtimes[path] = mtime
+                    site_changed.append(path)
+
+            for path in walk_suffix("man-src", ".adoc"):
+                mtime = getmtime(path)
+
+                if mtimes.get(path) != mtime:
+                    mtimes[path] = mtime
+                    man_changed.append(path)
+
+            if site_changed:
+                system([which_cached("asciidoctor"), "-b", WEB_FORMAT, *site_changed])
+
+            if man_changed:
+                system_parallel(
+                    [
+                        [which_cached("asciidoctor"), "-b", WEB_FORMAT, "-D", "./docs/man", *man_changed],
+                        [which_cached("asciidoctor"), "-b", MAN_FORMAT, "-D", "./man/man1", *man_changed],
+                    ]
+                )
+
+            sleep(1)
+
+    except KeyboardInterrupt:
+        print("stopped watching")
 
 
 def find_bad_lines():
     """locates any std.debug.print() calls in the source code"""
     print("reporting on source code...")
-    for dir_path, dir_names, files in walk("src"):
-        for file in files:
-            if file.endswith(".zig"):
-                with open(join(dir_path, file), "r", encoding="utf-8") as f:
-                    lines = f.read()
+    for path in walk_suffix("src", ".zig"):
+        with open(path, "rb") as f:
+            data = f.read()
 
-                    for line in lines:
-                        if line.find("std.debug.print") != -1:
-                            print(f"{join(dir_path, file)}: {line.strip()}")
+        # f.read() used to be iterated directly, which walks the
+        # file character by character and never matches a call
+        if b"std.debug.print" in data:
+            for line_number, line in enumerate(data.splitlines(), 1):
+                if b"std.debug.print" in line:
+                    print(
+                        f"{path}:{line_number}: {line.decode(errors='replace').strip()}"
+                    )
 
-                print(f"scanned {join(dir_path, file)}")
+        print(f"scanned {path}")
 
 
 def all():
@@ -139,16 +228,26 @@ def all():
 
 
 def max_size():
-    maximum_size = 0
+    return max(len(command_name) for command_name in commands)
+
+
+# The help listing order (fewest reliers first) and the joined relier
+# names per command, each computed once on first use
+@lru_cache(maxsize=None)
+def sorted_commands():
+    return sorted(
+        commands, key=lambda command: len(commands[command]["relies_on"]), reverse=False
+    )
 
-    for command_name in commands:
-        if len(command_name) > maximum_size:
-            maximum_size = len(command_name)
 
-    return maximum_size
+@lru_cache(maxsize=None)
+def relies_on_names(command: str) -> str:
+    return ", ".join(x.__name__ for x in commands[command]["relies_on"])
 
 
 def help_make():
+    from colorama import Style
+
     print(
         """
 usage: x.py [DIRECTIVE...]
@@ -157,16 +256,17 @@ a directive can be any of the following:
 """
     )
 
-    # sort command by how many reliers they have
-    new_commands = sorted(
-        commands, key=lambda command: len(commands[command]["relies_on"]), reverse=False
-    )
-    for command in new_commands:
-        print(f"\t{command.ljust(max_size() +2)}{commands[command]['description']}")
+    # computed once up front instead of re-walking commands for every row
+    width = max_size()
 
-        if "relies_on" in commands[command] and len(commands[command]["relies_on"]) > 0:
+    for command in sorted_commands():
+        entry = commands[command]
+
+        print(f"\t{command.ljust(width +2)}{entry['description']}")
+
+        if len(entry["relies_on"]) > 0:
             print(
-                f"{''.ljust(max_size() +12)}relies on steps: {Style.BRIGHT}{', '.join([x.__name__ for x in commands[command]['relies_on']])}{Style.RESET_ALL}"
+                f"{''.ljust(width +12)}relies on steps: {Style.BRIGHT}{relies_on_names(command)}{Style.RESET_ALL}"
             )
 
     print(
@@ -236,6 +336,11 @@ commands = {
         "description": "Builds the website documentation",
         "relies_on": [ensure_asciidoc],
     },
+    "serve": {
+        "runner": serve,
+        "description": "Watches the documentation sources and rebuilds changed files",
+        "relies_on": [ensure_asciidoc, docs],
+    },
     "man-pages": {
         "runner": man_pages,
         "description": "Builds the manual pages (also places them in the docs/man directory)",
@@ -258,6 +363,20 @@ commands = {
     },
 }
 
+# every step that already ran this invocation, keyed by function identity,
+# so shared dependencies like ensure_asciidoc fire exactly once no matter
+# how many directives rely on them
+completed_steps = set()
+
+
+def run_step(step) -> None:
+    if step is None or step in completed_steps:
+        return
+
+    completed_steps.add(step)
+    step()
+
+
 pos_argv = []
 
 for i in range(len(argv[1:]) + 1):
@@ -275,14 +394,15 @@ for i in range(len(argv[1:]) + 1):
 for arg in pos_argv[1:]:
     if commands.get(arg) is not None:
         for relier in commands[arg]["relies_on"]:
-            if relier is not None:
+            if relier is not None and relier not in completed_steps:
+                from colorama import Fore
+
                 print(
                     f"{Fore.MAGENTA}running dependent step{Fore.RESET}: {relier.__name__}"
                 )
-                relier()
+                run_step(relier)
 
         # headless commands are allowed
-        if commands[arg]["runner"] is not None:
-            commands[arg]["runner"]()
+        run_step(commands[arg]["runner"])
     else:
         print(f"unknown build directive: {arg}")